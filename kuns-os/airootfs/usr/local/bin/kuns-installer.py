@@ -2,15 +2,230 @@
 
 import sys
 import os
+import collections
+import re
+import shlex
 import subprocess
+import select
 import threading
 import time
-import tempfile
 import json
 import shutil
-from PyQt5.QtWidgets import *
-from PyQt5.QtCore import *
-from PyQt5.QtGui import *
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from PyQt5.QtWidgets import (
+    QAbstractItemView, QApplication, QButtonGroup, QCheckBox, QComboBox,
+    QFormLayout, QGroupBox, QHBoxLayout, QLabel, QLineEdit, QMainWindow,
+    QMessageBox, QPlainTextEdit, QProgressBar, QPushButton, QRadioButton,
+    QStackedWidget, QTableWidget, QTableWidgetItem, QVBoxLayout, QWidget
+)
+from PyQt5.QtCore import QThread, QTimer, Qt, pyqtSignal
+from PyQt5.QtGui import QFont
+
+_STYLESHEET = """
+QMainWindow {
+    background-color: #ecf0f1;
+}
+
+QWidget {
+    background-color: #ecf0f1;
+    color: #2c3e50;
+}
+
+QPushButton {
+    background-color: #3498db;
+    color: white;
+    border: none;
+    padding: 10px 20px;
+    font-size: 14px;
+    border-radius: 5px;
+    font-weight: bold;
+}
+
+QPushButton:hover {
+    background-color: #2980b9;
+}
+
+QPushButton:pressed {
+    background-color: #21618c;
+}
+
+QPushButton:disabled {
+    background-color: #bdc3c7;
+    color: #7f8c8d;
+}
+
+QLineEdit, QComboBox {
+    background-color: white;
+    border: 2px solid #bdc3c7;
+    padding: 8px;
+    border-radius: 4px;
+    font-size: 14px;
+}
+
+QLineEdit:focus, QComboBox:focus {
+    border-color: #3498db;
+}
+
+QGroupBox {
+    font-weight: bold;
+    border: 2px solid #bdc3c7;
+    border-radius: 5px;
+    margin-top: 10px;
+    padding-top: 10px;
+}
+
+QGroupBox::title {
+    subcontrol-origin: margin;
+    left: 10px;
+    padding: 0 5px 0 5px;
+}
+
+QProgressBar {
+    border: 2px solid #bdc3c7;
+    border-radius: 5px;
+    text-align: center;
+    font-weight: bold;
+}
+
+QProgressBar::chunk {
+    background-color: #27ae60;
+    border-radius: 3px;
+}
+
+QTableWidget {
+    background-color: white;
+    alternate-background-color: #f8f9fa;
+    border: 1px solid #bdc3c7;
+    border-radius: 4px;
+}
+
+QTableWidget::item {
+    padding: 8px;
+}
+
+QPlainTextEdit {
+    background-color: #2c3e50;
+    color: #ecf0f1;
+    border: 1px solid #34495e;
+    border-radius: 4px;
+    font-family: 'Consolas', 'Monaco', monospace;
+}
+
+QCheckBox {
+    spacing: 10px;
+}
+
+QCheckBox::indicator {
+    width: 18px;
+    height: 18px;
+}
+
+QCheckBox::indicator:unchecked {
+    border: 2px solid #bdc3c7;
+    background-color: white;
+    border-radius: 3px;
+}
+
+QCheckBox::indicator:checked {
+    border: 2px solid #27ae60;
+    background-color: #27ae60;
+    border-radius: 3px;
+}
+
+QRadioButton::indicator {
+    width: 18px;
+    height: 18px;
+    border-radius: 9px;
+}
+
+QRadioButton::indicator:unchecked {
+    border: 2px solid #bdc3c7;
+    background-color: white;
+}
+
+QRadioButton::indicator:checked {
+    border: 2px solid #3498db;
+    background-color: #3498db;
+}
+"""
+
+_WELCOME_HTML = """
+<div style="text-align: center;">
+<h1 style="color: #2980b9; margin-bottom: 20px;">Welcome to Kuns OS!</h1>
+
+<div style="background: rgba(52, 152, 219, 0.1); padding: 20px; border-radius: 10px; margin: 20px 0;">
+<h2 style="color: #3498db; margin-top: 0;">Kuns OS Special Features</h2>
+
+<div style="text-align: left; margin: 15px 0;">
+<p style="margin: 8px 0;"><b>Enlightenment Desktop</b><br>
+&nbsp;&nbsp;&nbsp;&nbsp;Beautiful and lightweight desktop environment</p>
+
+<p style="margin: 8px 0;"><b>Best KDE + GNOME Apps</b><br>
+&nbsp;&nbsp;&nbsp;&nbsp;Dolphin, Kate, Nautilus, GIMP and more useful tools</p>
+
+<p style="margin: 8px 0;"><b>Flatpak Support</b><br>
+&nbsp;&nbsp;&nbsp;&nbsp;Easy app installation and management</p>
+
+<p style="margin: 8px 0;"><b>Multi-language Support</b><br>
+&nbsp;&nbsp;&nbsp;&nbsp;Optimized environment for global users</p>
+</div>
+</div>
+
+<div style="background: rgba(231, 76, 60, 0.1); padding: 15px; border-radius: 8px; margin: 20px 0;">
+<p style="color: #e74c3c; font-weight: bold; margin: 0;">
+Important Notice<br>
+All data on the selected disk will be deleted during installation.<br>
+Please backup important data beforehand.
+</p>
+</div>
+</div>
+"""
+
+_FINISH_HTML = """
+<div style="text-align: center;">
+<h1 style="color: #27ae60; margin-bottom: 20px;">Kuns OS Installation Complete!</h1>
+
+<p style="font-size: 16px; margin: 15px 0;">
+Congratulations! Kuns OS has been installed successfully.
+</p>
+
+<div style="background: rgba(52, 152, 219, 0.1); padding: 20px; border-radius: 10px; margin: 20px;">
+<h3 style="color: #3498db; margin-top: 0;">Next Steps</h3>
+<div style="text-align: left;">
+<p><b>1.</b> Remove installation media (USB/DVD)</p>
+<p><b>2.</b> Restart your computer</p>
+<p><b>3.</b> Enjoy Enlightenment desktop!</p>
+<p><b>4.</b> Install additional apps with Flatpak</p>
+</div>
+</div>
+
+<p style="color: #7f8c8d; font-size: 14px;">
+If you have issues, contact the Kuns OS community.
+</p>
+</div>
+"""
+
+_CONFIRM_TMPL = (
+    "Would you like to start Kuns OS installation with the following settings?\n\n"
+    "Disk: {disk}\n"
+    "User: {user}\n"
+    "Hostname: {host}\n"
+    "Installation Type: {itype}\n"
+    "Packages: {n} packages\n\n"
+    "WARNING: All data on {disk} will be deleted!"
+)
+
+# Navigation button state per page:
+# (prev visible, prev enabled, next visible, install visible, cancel text)
+_PAGE_STATE = (
+    (True, False, True, False, "Cancel"),               # Welcome
+    (True, True, True, False, "Cancel"),                # Disk selection
+    (True, True, True, False, "Cancel"),                # User configuration
+    (True, True, False, True, "Cancel"),                # Package selection
+    (True, False, False, False, "Cancel Installation"), # Installation
+    (False, False, False, False, "Close"),              # Completion
+)
 
 
 
@@ -25,57 +240,69 @@ class ArchInstallThread(QThread):
         self.config = config
         self.mount_point = "/mnt"
         self.boot_mount = "/mnt/boot"
+        
+        # Command output is coalesced here before being emitted to the GUI
+        self._log_buf = []
+        self._log_lock = threading.Lock()
+        self._last_log_flush = time.monotonic()
+        self._last_progress = None
 
     def run(self):
         try:
             self.status.emit("Starting installation...")
-            self.progress.emit(0)
+            self._set_progress(0)
+            
+            # Resolve the target disk and partition names once
+            self.disk = self.config.get('disk', '/dev/sda')
+            suffix = 'p' if ('nvme' in self.disk or 'mmc' in self.disk) else ''
+            self.efi_partition = f"{self.disk}{suffix}1"
+            self.root_partition = f"{self.disk}{suffix}2"
             
             # Step 1: Prepare disk
             if not self._prepare_disk():
                 self.finished.emit(False, "Disk preparation failed")
                 return
-            self.progress.emit(15)
+            self._set_progress(15)
             
             # Step 2: Create filesystems
             if not self._create_filesystems():
                 self.finished.emit(False, "Filesystem creation failed")
                 return
-            self.progress.emit(25)
+            self._set_progress(25)
             
             # Step 3: Mount filesystems
             if not self._mount_filesystems():
                 self.finished.emit(False, "Filesystem mounting failed")
                 return
-            self.progress.emit(35)
+            self._set_progress(35)
             
             # Step 4: Install base system
             if not self._install_base_system():
                 self.finished.emit(False, "Base system installation failed")
                 return
-            self.progress.emit(60)
+            self._set_progress(60)
             
             # Step 5: Generate fstab
             if not self._generate_fstab():
                 self.finished.emit(False, "fstab generation failed")
                 return
-            self.progress.emit(65)
+            self._set_progress(65)
             
             # Step 6: Configure system
             if not self._configure_system():
                 self.finished.emit(False, "System configuration failed")
                 return
-            self.progress.emit(80)
+            self._set_progress(80)
             
             # Step 7: Install bootloader
             if not self._install_bootloader():
                 self.finished.emit(False, "Bootloader installation failed")
                 return
-            self.progress.emit(95)
+            self._set_progress(95)
             
             # Step 8: Final cleanup
             self._cleanup_installation()
-            self.progress.emit(100)
+            self._set_progress(100)
             
             self.status.emit("Installation completed successfully!")
             self.finished.emit(True, "Kuns OS installation completed successfully!")
@@ -85,24 +312,39 @@ class ArchInstallThread(QThread):
             self.finished.emit(False, f"Installation error: {str(e)}")
 
     def _run_command(self, cmd, description="", check=True):
-        """Execute a command and return success status"""
+        """Execute a command (argument list) and return success status"""
         try:
-            self.log_output.emit(f"Executing: {' '.join(cmd) if isinstance(cmd, list) else cmd}")
+            self.log_output.emit(f"Executing: {' '.join(cmd)}")
             
-            if isinstance(cmd, str):
-                process = subprocess.Popen(cmd, shell=True, stdout=subprocess.PIPE, 
-                                         stderr=subprocess.STDOUT, universal_newlines=True)
-            else:
-                process = subprocess.Popen(cmd, stdout=subprocess.PIPE, 
-                                         stderr=subprocess.STDOUT, universal_newlines=True)
+            env = {**os.environ, "PYTHONUNBUFFERED": "1"}
+            process = subprocess.Popen(cmd, stdout=subprocess.PIPE,
+                                     stderr=subprocess.STDOUT, env=env)
             
-            output = ""
-            for line in iter(process.stdout.readline, ''):
-                line = line.strip()
-                if line:
-                    output += line + "\n"
-                    self.log_output.emit(line)
+            # Drain output in large chunks; lines are queued in the log buffer
+            # and emitted in batches instead of one signal per line
+            fd = process.stdout.fileno()
+            os.set_blocking(fd, False)
+            buf = bytearray()
+            while True:
+                ready, _, _ = select.select([fd], [], [], 0.05)
+                if ready:
+                    try:
+                        chunk = os.read(fd, 65536)
+                    except BlockingIOError:
+                        continue
+                    if not chunk:
+                        break
+                    buf.extend(chunk)
+                    *lines, rest = buf.split(b"\n")
+                    buf = bytearray(rest)
+                    self._buffer_log(lines)
+                
+                self._flush_log()
             
+            self._buffer_log([buf])
+            self._flush_log(force=True)
+            
+            process.stdout.close()
             process.wait()
             
             if check and process.returncode != 0:
@@ -115,10 +357,36 @@ class ArchInstallThread(QThread):
             self.log_output.emit(f"Command execution error: {str(e)}")
             return False
 
+    def _set_progress(self, value):
+        """Emit a progress update only when the value changes"""
+        if value != self._last_progress:
+            self._last_progress = value
+            self.progress.emit(value)
+
+    def _buffer_log(self, lines):
+        """Queue raw output lines for the next log batch"""
+        with self._log_lock:
+            for line in lines:
+                line = line.decode(errors="replace").strip()
+                if line:
+                    self._log_buf.append(line)
+
+    def _flush_log(self, force=False):
+        """Emit buffered log lines once enough lines or time have accumulated"""
+        with self._log_lock:
+            if not self._log_buf:
+                return
+            if not force and len(self._log_buf) < 64 and time.monotonic() - self._last_log_flush < 0.05:
+                return
+            batch = "\n".join(self._log_buf)
+            self._log_buf = []
+            self._last_log_flush = time.monotonic()
+        self.log_output.emit(batch)
+
     def _prepare_disk(self):
         """Prepare disk for installation"""
         self.status.emit("Preparing disk...")
-        disk = self.config.get('disk', '/dev/sda')
+        disk = self.disk
         
         # Check if disk exists
         if not os.path.exists(disk):
@@ -126,59 +394,56 @@ class ArchInstallThread(QThread):
             return False
         
         # Unmount any existing partitions
-        self.log_output.emit("Unmounting existing partitions...")
-        self._run_command(f"umount -R {self.mount_point}", check=False)
-        
-        # Create new partition table
-        self.log_output.emit("Creating new partition table...")
-        if not self._run_command(f"parted -s {disk} mklabel gpt"):
-            return False
-        
-        # Create EFI partition (512MB)
-        self.log_output.emit("Creating EFI partition...")
-        if not self._run_command(f"parted -s {disk} mkpart primary fat32 1MiB 513MiB"):
-            return False
-        if not self._run_command(f"parted -s {disk} set 1 esp on"):
-            return False
-        
-        # Create root partition (rest of disk)
-        self.log_output.emit("Creating root partition...")
-        if not self._run_command(f"parted -s {disk} mkpart primary ext4 513MiB 100%"):
+        if self._is_mounted(self.mount_point):
+            self.log_output.emit("Unmounting existing partitions...")
+            self._run_command(["umount", "-R", self.mount_point], check=False)
+        
+        # Create new partition table, EFI partition (512MB) and root partition
+        # (rest of disk) in a single parted invocation
+        self.log_output.emit("Creating partition table and partitions...")
+        cmd = [
+            "parted", "-s", "-a", "optimal", disk,
+            "mklabel", "gpt",
+            "mkpart", "primary", "fat32", "1MiB", "513MiB",
+            "set", "1", "esp", "on",
+            "mkpart", "primary", "ext4", "513MiB", "100%"
+        ]
+        if not self._run_command(cmd):
             return False
         
         # Wait for partitions to be recognized
-        time.sleep(2)
-        self._run_command("partprobe", check=False)
-        time.sleep(1)
+        self._run_command(["partprobe", disk], check=False)
+        self._run_command(["udevadm", "settle", "--timeout=5"], check=False)
         
         return True
 
+    def _is_mounted(self, path):
+        """Check whether anything is mounted at or below path"""
+        with open("/proc/self/mountinfo") as f:
+            for line in f:
+                mount_point = line.split()[4]
+                if mount_point == path or mount_point.startswith(f"{path}/"):
+                    return True
+        return False
+
     def _create_filesystems(self):
         """Create filesystems on partitions"""
         self.status.emit("Creating filesystems...")
-        disk = self.config.get('disk', '/dev/sda')
-        
-        # Determine partition names
-        if 'nvme' in disk or 'mmc' in disk:
-            efi_part = f"{disk}p1"
-            root_part = f"{disk}p2"
-        else:
-            efi_part = f"{disk}1"
-            root_part = f"{disk}2"
-        
-        # Format EFI partition
-        self.log_output.emit("Formatting EFI partition...")
-        if not self._run_command(f"mkfs.fat -F32 {efi_part}"):
-            return False
         
-        # Format root partition
-        self.log_output.emit("Formatting root partition...")
-        if not self._run_command(f"mkfs.ext4 -F {root_part}"):
-            return False
+        # Format EFI and root partitions in parallel; inode tables and the
+        # journal are initialized lazily by the kernel after mounting
+        self.log_output.emit("Formatting EFI and root partitions...")
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            efi_format = executor.submit(self._run_command, ["mkfs.fat", "-F32", "-I", self.efi_partition])
+            root_format = executor.submit(self._run_command, [
+                "mkfs.ext4", "-F", "-E", "lazy_itable_init=1,lazy_journal_init=1", self.root_partition
+            ])
+            if not efi_format.result() or not root_format.result():
+                return False
         
-        # Store partition info for later use
-        self.efi_partition = efi_part
-        self.root_partition = root_part
+        # Cache filesystem UUIDs for fstab and the GRUB configuration
+        self.root_uuid = self._get_uuid(self.root_partition)
+        self.efi_uuid = self._get_uuid(self.efi_partition)
         
         return True
 
@@ -191,7 +456,7 @@ class ArchInstallThread(QThread):
         
         # Mount root partition first
         self.log_output.emit("Mounting root partition...")
-        if not self._run_command(f"mount {self.root_partition} {self.mount_point}"):
+        if not self._run_command(["mount", self.root_partition, self.mount_point]):
             return False
         
         # Create boot mount point after root is mounted
@@ -200,7 +465,7 @@ class ArchInstallThread(QThread):
         
         # Mount EFI partition
         self.log_output.emit("Mounting EFI partition...")
-        if not self._run_command(f"mount {self.efi_partition} {self.boot_mount}"):
+        if not self._run_command(["mount", self.efi_partition, self.boot_mount]):
             return False
         
         return True
@@ -209,25 +474,72 @@ class ArchInstallThread(QThread):
         """Install base system using pacstrap"""
         self.status.emit("Installing base system...")
         
-        # Get packages to install
-        packages = self._get_packages_list()
+        # Use a pacman configuration with parallel downloads for pacstrap
+        pacman_conf = self._write_pacman_config()
+        
+        # Get packages to install, dropping any the repositories don't provide
+        packages = self._resolve_packages(self._get_packages_list(), pacman_conf)
         packages_str = " ".join(packages)
         
         self.log_output.emit(f"Installing packages: {packages_str}")
         
         # Use pacstrap to install base system
-        cmd = f"pacstrap {self.mount_point} {packages_str}"
+        cmd = ["pacstrap", "-K", "-C", pacman_conf, self.mount_point] + packages
+        cmd += ["--noconfirm", "--disable-download-timeout"]
         if not self._run_command(cmd):
             return False
         
         return True
 
+    def _write_pacman_config(self):
+        """Write a copy of the host pacman.conf tuned for pacstrap"""
+        pacman_conf = "/tmp/kuns-installer-pacman.conf"
+        
+        with open("/etc/pacman.conf") as f:
+            content = f.read()
+        
+        # Enable parallel downloads
+        if re.search(r"^#?\s*ParallelDownloads\b", content, flags=re.M):
+            content = re.sub(r"^#?\s*ParallelDownloads\b.*$", "ParallelDownloads = 10",
+                             content, flags=re.M)
+        else:
+            content = content.replace("[options]\n", "[options]\nParallelDownloads = 10\n", 1)
+        
+        with open(pacman_conf, "w") as f:
+            f.write(content)
+        
+        return pacman_conf
+
+    def _resolve_packages(self, packages, pacman_conf):
+        """Check packages against the sync repositories so pacstrap fails fast"""
+        self.log_output.emit("Resolving package list...")
+        cmd = ["pacman", "-Syp", "--config", pacman_conf, "--print-format", "%n"] + packages
+        result = subprocess.run(cmd, capture_output=True, text=True,
+                              env={**os.environ, "LC_ALL": "C"})
+        if result.returncode == 0:
+            return packages
+        
+        # pacman reports every unknown target before giving up
+        missing = set()
+        for line in result.stderr.splitlines():
+            if line.startswith("error: target not found:"):
+                missing.add(line.split(":", 2)[2].strip())
+        
+        if not missing or len(missing) == len(packages):
+            # Not a missing package problem (e.g. no network); let pacstrap report it
+            self.log_output.emit(f"Warning: could not resolve packages:\n{result.stderr.strip()}")
+            return packages
+        
+        for package in sorted(missing):
+            self.log_output.emit(f"Warning: package {package} not found, skipping")
+        return [p for p in packages if p not in missing]
+
     def _get_packages_list(self):
         """Get list of packages to install"""
         base_packages = [
             "base", "base-devel", "linux", "linux-firmware",
             "networkmanager", "grub", "efibootmgr", "dosfstools",
-            "mtools", "os-prober", "sudo", "nano", "vim"
+            "mtools", "os-prober", "sudo", "nano"
         ]
         
         # Add Kuns OS specific packages
@@ -242,99 +554,139 @@ class ArchInstallThread(QThread):
         user_packages = self.config.get('packages', [])
         
         all_packages = base_packages + kuns_packages + user_packages
-        return list(set(all_packages))  # Remove duplicates
+        return list(dict.fromkeys(all_packages))  # Remove duplicates, keep order
 
     def _generate_fstab(self):
         """Generate fstab file"""
         self.status.emit("Generating fstab...")
         
         self.log_output.emit("Generating fstab file...")
-        if not self._run_command(f"genfstab -U {self.mount_point} >> {self.mount_point}/etc/fstab"):
+        root_uuid = self.root_uuid
+        efi_uuid = self.efi_uuid
+        if not root_uuid or not efi_uuid:
+            self.log_output.emit("Could not determine partition UUIDs")
             return False
         
+        fstab_content = f"""
+# {self.root_partition}
+UUID={root_uuid}	/     	ext4      	rw,relatime	0 1
+
+# {self.efi_partition}
+UUID={efi_uuid}	/boot 	vfat      	rw,relatime,fmask=0022,dmask=0022,codepage=437,iocharset=ascii,shortname=mixed,utf8,errors=remount-ro	0 2
+"""
+        with open(f"{self.mount_point}/etc/fstab", "a") as f:
+            f.write(fstab_content)
+        
         return True
 
+    def _get_uuid(self, partition):
+        """Return the filesystem UUID of a partition, or None"""
+        result = subprocess.run(["blkid", "-o", "export", partition],
+                              capture_output=True, text=True)
+        for line in result.stdout.splitlines():
+            if line.startswith("UUID="):
+                return line[len("UUID="):]
+        return None
+
     def _configure_system(self):
         """Configure the installed system"""
         self.status.emit("Configuring system...")
         
-        # Set timezone
         timezone = self.config.get('timezone', 'UTC')
-        self.log_output.emit(f"Setting timezone to {timezone}")
-        if not self._run_command(f"arch-chroot {self.mount_point} ln -sf /usr/share/zoneinfo/{timezone} /etc/localtime"):
-            return False
-        if not self._run_command(f"arch-chroot {self.mount_point} hwclock --systohc"):
-            return False
-        
-        # Configure locale
         locale = self.config.get('locale', 'en_US.UTF-8')
-        self.log_output.emit(f"Setting locale to {locale}")
-        
-        # Enable the locale in /etc/locale.gen
-        if not self._run_command(f"arch-chroot {self.mount_point} sed -i 's/^#{locale}/{locale}/' /etc/locale.gen"):
-            return False
-        
-        # Also ensure en_US.UTF-8 is always available
-        if locale != 'en_US.UTF-8':
-            if not self._run_command(f"arch-chroot {self.mount_point} sed -i 's/^#en_US.UTF-8/en_US.UTF-8/' /etc/locale.gen"):
-                return False
-        
-        if not self._run_command(f"arch-chroot {self.mount_point} locale-gen"):
-            return False
-        
-        # Set system locale
-        with open(f"{self.mount_point}/etc/locale.conf", "w") as f:
-            f.write(f"LANG={locale}\n")
-        
-        # Set keyboard layout
         keymap = self.config.get('keymap', 'us')
-        with open(f"{self.mount_point}/etc/vconsole.conf", "w") as f:
-            f.write(f"KEYMAP={keymap}\n")
-        
-        # Set hostname
         hostname = self.config.get('hostname', 'kuns-os')
-        with open(f"{self.mount_point}/etc/hostname", "w") as f:
-            f.write(f"{hostname}\n")
+        root_password = self.config.get('root_password', '')
+        username = self.config.get('username', 'kunsos')
+        user_password = self.config.get('password', '')
         
-        # Configure hosts file
+        # Small config files that don't depend on anything inside the chroot
         hosts_content = f"""127.0.0.1	localhost
 ::1		localhost
 127.0.1.1	{hostname}.localdomain	{hostname}
 """
-        with open(f"{self.mount_point}/etc/hosts", "w") as f:
-            f.write(hosts_content)
+        config_files = {
+            f"{self.mount_point}/etc/locale.conf": f"LANG={locale}\n",
+            f"{self.mount_point}/etc/vconsole.conf": f"KEYMAP={keymap}\n",
+            f"{self.mount_point}/etc/hostname": f"{hostname}\n",
+            f"{self.mount_point}/etc/hosts": hosts_content,
+        }
         
-        # Set root password
-        root_password = self.config.get('root_password', '')
+        # Enable the locale (and always en_US.UTF-8) in /etc/locale.gen
+        self._uncomment_line("/etc/locale.gen", locale)
+        if locale != 'en_US.UTF-8':
+            self._uncomment_line("/etc/locale.gen", "en_US.UTF-8")
+        
+        # Allow the wheel group to use sudo
+        self._uncomment_line("/etc/sudoers", "%wheel ALL=(ALL:ALL) ALL", comment="# ")
+        
+        # Build a single script so every chroot step runs in one arch-chroot session
+        script = [
+            "#!/bin/bash",
+            "set -e",
+            "",
+            # Set timezone
+            f"echo {shlex.quote(f'Setting timezone to {timezone}')}",
+            f"ln -sf {shlex.quote(f'/usr/share/zoneinfo/{timezone}')} /etc/localtime",
+            "hwclock --systohc",
+            "",
+            # Generate locales
+            f"echo {shlex.quote(f'Setting locale to {locale}')}",
+            "locale-gen",
+            "",
+        ]
+        
+        # Set root password (passed through a variable, never on a command line)
         if root_password:
-            self.log_output.emit("Setting root password...")
-            if not self._run_command(f"arch-chroot {self.mount_point} bash -c 'echo \"root:{root_password}\" | chpasswd'"):
-                return False
+            script += [
+                'echo "Setting root password..."',
+                f"ROOT_PASSWORD={shlex.quote(root_password)}",
+                'printf \'root:%s\\n\' "$ROOT_PASSWORD" | chpasswd',
+                "unset ROOT_PASSWORD",
+                "",
+            ]
         
         # Create user
-        username = self.config.get('username', 'kunsos')
-        user_password = self.config.get('password', '')
-        
         if username and user_password:
-            self.log_output.emit(f"Creating user {username}...")
-            if not self._run_command(f"arch-chroot {self.mount_point} useradd -m -G wheel -s /bin/bash {username}"):
-                return False
-            if not self._run_command(f"arch-chroot {self.mount_point} bash -c 'echo \"{username}:{user_password}\" | chpasswd'"):
-                return False
-        
-        # Configure sudo
-        self.log_output.emit("Configuring sudo...")
-        if not self._run_command(f"arch-chroot {self.mount_point} sed -i 's/^# %wheel ALL=(ALL:ALL) ALL/%wheel ALL=(ALL:ALL) ALL/' /etc/sudoers"):
-            return False
+            script += [
+                f"echo {shlex.quote(f'Creating user {username}...')}",
+                f"useradd -m -G wheel -s /bin/bash {shlex.quote(username)}",
+                f"USER_NAME={shlex.quote(username)}",
+                f"USER_PASSWORD={shlex.quote(user_password)}",
+                'printf \'%s:%s\\n\' "$USER_NAME" "$USER_PASSWORD" | chpasswd',
+                "unset USER_PASSWORD",
+                "",
+            ]
         
-        # Enable NetworkManager
-        self.log_output.emit("Enabling NetworkManager...")
-        if not self._run_command(f"arch-chroot {self.mount_point} systemctl enable NetworkManager"):
-            return False
+        script += [
+            # Validate the edited sudoers file
+            'echo "Configuring sudo..."',
+            "visudo -c -f /etc/sudoers",
+            "",
+            # Enable NetworkManager and LightDM
+            'echo "Enabling NetworkManager and LightDM..."',
+            "systemctl enable NetworkManager lightdm",
+        ]
         
-        # Enable LightDM
-        self.log_output.emit("Enabling LightDM...")
-        if not self._run_command(f"arch-chroot {self.mount_point} systemctl enable lightdm"):
+        script_path = f"{self.mount_point}/root/configure.sh"
+        # Create the script root-only from the start, it contains passwords
+        fd = os.open(script_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o700)
+        with os.fdopen(fd, "w") as f:
+            f.write("\n".join(script) + "\n")
+        
+        # Write the config files while the chroot script runs
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            writes = [executor.submit(Path(path).write_text, content)
+                      for path, content in config_files.items()]
+            try:
+                success = self._run_command(["arch-chroot", self.mount_point, "bash", "/root/configure.sh"])
+            finally:
+                # The script contains passwords, never leave it on the target
+                os.remove(script_path)
+            for write in writes:
+                write.result()
+        
+        if not success:
             return False
         
         # Copy Kuns OS personalization settings
@@ -344,6 +696,14 @@ class ArchInstallThread(QThread):
         
         return True
 
+    def _uncomment_line(self, path, line, comment="#"):
+        """Uncomment a line in a file on the target system"""
+        target = Path(f"{self.mount_point}{path}")
+        content = target.read_text()
+        # Match the exact commented form so header examples like "#  en_US.UTF-8" stay untouched
+        content = re.sub(rf"^{re.escape(comment + line)}(?=\s|$)", line, content, flags=re.M)
+        target.write_text(content)
+
     def _copy_personalization_settings(self):
         """Install Kuns OS customizations without copying live environment settings"""
         try:
@@ -445,7 +805,7 @@ exec enlightenment_start
             
             # Set proper ownership for user files
             self.log_output.emit("Setting file ownership...")
-            if not self._run_command(f"arch-chroot {self.mount_point} chown -R {username}:{username} /home/{username}", check=False):
+            if not self._run_command(["arch-chroot", self.mount_point, "chown", "-R", f"{username}:{username}", f"/home/{username}"], check=False):
                 self.log_output.emit("Warning: Failed to set ownership")
             
             self.log_output.emit("✓ Fresh Kuns OS customizations installed successfully")
@@ -459,31 +819,28 @@ exec enlightenment_start
         """Install GRUB bootloader"""
         self.status.emit("Installing bootloader...")
         
-        disk = self.config.get('disk', '/dev/sda')
-        
-        # Determine partition names
-        if 'nvme' in disk or 'mmc' in disk:
-            boot_part = f"{disk}p1"
-        else:
-            boot_part = f"{disk}1"
+        disk = self.disk
         
         # Set boot flag on EFI partition
         self.log_output.emit("Setting boot flag on EFI partition...")
-        self._run_command(f"parted {disk} set 1 boot on", check=False)
+        self._run_command(["parted", "-s", disk, "set", "1", "boot", "on"], check=False)
         
         # Create EFI boot directory
         self.log_output.emit("Creating EFI boot directory...")
-        if not self._run_command(f"arch-chroot {self.mount_point} mkdir -p /boot/EFI"):
-            return False
+        os.makedirs(f"{self.mount_point}/boot/EFI", exist_ok=True)
         
         # Try both installation methods for maximum compatibility
         self.log_output.emit("Installing GRUB for both EFI and BIOS...")
         
-        # EFI installation
-        efi_success = self._run_command(f"arch-chroot {self.mount_point} grub-install --target=x86_64-efi --efi-directory=/boot --bootloader-id=KunsOS --no-nvram --removable", check=False)
-        
-        # BIOS installation (for fallback)
-        bios_success = self._run_command(f"arch-chroot {self.mount_point} grub-install --target=i386-pc {disk}", check=False)
+        # Run the installs one after the other: both write /boot/grub (fonts,
+        # locale, grubenv) and each arch-chroot session mounts the same API filesystems
+        efi_success = self._run_command([
+            "arch-chroot", self.mount_point, "grub-install", "--target=x86_64-efi",
+            "--efi-directory=/boot", "--bootloader-id=KunsOS", "--no-nvram", "--removable"
+        ])
+        bios_success = self._run_command([
+            "arch-chroot", self.mount_point, "grub-install", "--target=i386-pc", disk
+        ])
         
         if efi_success:
             self.log_output.emit("EFI GRUB installation successful")
@@ -542,20 +899,26 @@ GRUB_BACKGROUND="/boot/grub/background.png"
 
         # Generate GRUB configuration
         self.log_output.emit("Generating GRUB configuration...")
-        if not self._run_command(f"arch-chroot {self.mount_point} grub-mkconfig -o /boot/grub/grub.cfg"):
+        if not self._run_command(["arch-chroot", self.mount_point, "grub-mkconfig", "-o", "/boot/grub/grub.cfg"]):
             return False
         
         # Create multiple fallback boot entries
         self.log_output.emit("Creating fallback boot entries...")
         
-        # Standard EFI fallback
-        self._run_command(f"arch-chroot {self.mount_point} mkdir -p /boot/EFI/BOOT", check=False)
-        self._run_command(f"arch-chroot {self.mount_point} cp /boot/EFI/KunsOS/grubx64.efi /boot/EFI/BOOT/BOOTX64.EFI", check=False)
+        # Standard EFI fallback (grub-install --removable may already have written it)
+        efi_loader = f"{self.mount_point}/boot/EFI/KunsOS/grubx64.efi"
+        if os.path.exists(efi_loader):
+            try:
+                os.makedirs(f"{self.mount_point}/boot/EFI/BOOT", exist_ok=True)
+                shutil.copyfile(efi_loader, f"{self.mount_point}/boot/EFI/BOOT/BOOTX64.EFI")
+                self.log_output.emit("✓ EFI fallback loader copied")
+            except Exception as e:
+                self.log_output.emit(f"Warning: Failed to copy EFI fallback loader: {e}")
         
         # Create simple GRUB config for direct booting
         grub_standalone = f"""
 set root='hd0,gpt2'
-linux /boot/vmlinuz-linux root=UUID=$(blkid -s UUID -o value {self.root_partition}) rw
+linux /boot/vmlinuz-linux root=UUID={self.root_uuid} rw
 initrd /boot/initramfs-linux.img
 boot
 """
@@ -565,7 +928,7 @@ boot
         
         # Make MBR bootable as well
         self.log_output.emit("Making disk bootable...")
-        self._run_command(f"parted {disk} set 1 legacy_boot on", check=False)
+        self._run_command(["parted", "-s", disk, "set", "1", "legacy_boot", "on"], check=False)
         
         return True
 
@@ -575,14 +938,68 @@ boot
         
         # Unmount filesystems
         self.log_output.emit("Unmounting filesystems...")
-        self._run_command(f"umount -R {self.mount_point}", check=False)
+        self._run_command(["umount", "-R", self.mount_point], check=False)
         
         self.log_output.emit("Installation cleanup completed")
 
+def _readonly_item(text):
+    """Create a non-editable table item"""
+    item = QTableWidgetItem(text)
+    item.setFlags(item.flags() & ~Qt.ItemIsEditable)
+    return item
+
+class DiskScanThread(QThread):
+    result = pyqtSignal(list)
+    error = pyqtSignal(str)
+
+    MIN_SIZE = 1 << 30  # 1GB minimum
+
+    def run(self):
+        try:
+            # Get all block devices (sizes in bytes, JSON output)
+            result = subprocess.run(['lsblk', '-dpJbo', 'NAME,SIZE,MODEL,TYPE,RO'],
+                                  capture_output=True, text=True, check=True)
+            
+            disks = []
+            for device in json.loads(result.stdout)['blockdevices']:
+                name = device['name']
+                size_bytes = int(device.get('size') or 0)
+                
+                # lsblk classifies loop and optical devices by type, but zram and
+                # brd ram devices are reported as plain disks
+                if (device.get('type') == 'disk' and size_bytes >= self.MIN_SIZE and
+                    not int(device.get('ro') or 0) and
+                    not os.path.basename(name).startswith(('zram', 'ram'))):
+                    disks.append({
+                        'device': name,
+                        'size': self._format_size(size_bytes),
+                        'model': (device.get('model') or 'Unknown').strip(),
+                        'size_bytes': size_bytes
+                    })
+            
+            # Sort disks by size (largest first)
+            disks.sort(key=lambda x: x['size_bytes'], reverse=True)
+            
+            self.result.emit(disks)
+            
+        except subprocess.CalledProcessError as e:
+            self.error.emit(f"Failed to retrieve disk information:\n{e}")
+        except Exception as e:
+            self.error.emit(f"Unexpected error while scanning disks:\n{e}")
+
+    def _format_size(self, size_bytes):
+        """Format a size in bytes for display (e.g., '8G', '465.8G')"""
+        units = "BKMGTP"
+        exponent = min(max(size_bytes.bit_length() - 1, 0) // 10, len(units) - 1)
+        value = f"{size_bytes / (1 << (10 * exponent)):.1f}".rstrip('0').rstrip('.')
+        return f"{value}{units[exponent]}"
+
 class DiskSelectionWidget(QWidget):
     def __init__(self):
         super().__init__()
         self.button_group = QButtonGroup()  # Radio button grouping
+        self.scan_thread = None
+        self.selected_disk = None  # Kept in sync with the checked radio button
         self.setup_ui()
         self.refresh_disks()
         
@@ -641,59 +1058,40 @@ class DiskSelectionWidget(QWidget):
         layout.addWidget(warning)
         
     def refresh_disks(self):
+        # Scan disks in the background so the UI stays responsive
+        if self.scan_thread and self.scan_thread.isRunning():
+            return
+        
+        # Parent the thread to the widget so Qt owns it alongside the page
+        self.scan_thread = DiskScanThread(self)
+        self.scan_thread.result.connect(self._populate_table)
+        self.scan_thread.error.connect(self._on_scan_error)
+        self.scan_thread.start()
+    
+    def _populate_table(self, disks):
+        """Fill the disk table with the scan results"""
+        # Drop results that arrive after the user has left the disk page, so a
+        # late rescan can't clear or silently change the confirmed selection
+        if self.isHidden():
+            return
+        
         # Clear existing data
         self.disk_table.setRowCount(0)
         for button in self.button_group.buttons():
             self.button_group.removeButton(button)
+        self.selected_disk = None
+        
+        if not disks:
+            QMessageBox.warning(self, "No Disks Found", 
+                              "No suitable installation disks found.\n"
+                              "Please ensure you have at least one disk with 1GB+ capacity.")
+            return
         
+        # Populate the table in a single layout/repaint pass
+        self.disk_table.setUpdatesEnabled(False)
+        self.disk_table.setSortingEnabled(False)
+        self.disk_table.blockSignals(True)
         try:
-            # Get all block devices
-            result = subprocess.run(['lsblk', '-dpno', 'NAME,SIZE,MODEL,TYPE'], 
-                                  capture_output=True, text=True, check=True)
-            
-            disks = []
-            for line in result.stdout.strip().split('\n'):
-                if line and '/dev/' in line:
-                    parts = line.split(None, 3)
-                    if len(parts) >= 3:
-                        device = parts[0]
-                        size = parts[1]
-                        model = parts[2] if len(parts) > 2 else 'Unknown'
-                        device_type = parts[3] if len(parts) > 3 else 'disk'
-                        
-                        # Filter out loop devices, sr (optical), and other non-disk devices
-                        if ('loop' not in device and 'sr' not in device and 
-                            'ram' not in device and 'zram' not in device and
-                            device_type == 'disk'):
-                            
-                            # Additional check for minimum size (at least 1GB)
-                            try:
-                                size_bytes = self._parse_size(size)
-                                if size_bytes >= 1024 * 1024 * 1024:  # 1GB minimum
-                                    disks.append({
-                                        'device': device,
-                                        'size': size,
-                                        'model': model,
-                                        'size_bytes': size_bytes
-                                    })
-                            except ValueError:
-                                # If size parsing fails, still include the disk
-                                disks.append({
-                                    'device': device,
-                                    'size': size,
-                                    'model': model,
-                                    'size_bytes': 0
-                                })
-            
-            # Sort disks by size (largest first)
-            disks.sort(key=lambda x: x['size_bytes'], reverse=True)
-            
-            if not disks:
-                QMessageBox.warning(self, "No Disks Found", 
-                                  "No suitable installation disks found.\n"
-                                  "Please ensure you have at least one disk with 1GB+ capacity.")
-                return
-            
             self.disk_table.setRowCount(len(disks))
             for i, disk in enumerate(disks):
                 # Radio button
@@ -715,48 +1113,16 @@ class DiskSelectionWidget(QWidget):
                 self.disk_table.setCellWidget(i, 0, radio_widget)
                 
                 # Disk information
-                device_item = QTableWidgetItem(disk['device'])
-                device_item.setFlags(device_item.flags() & ~Qt.ItemIsEditable)
-                self.disk_table.setItem(i, 1, device_item)
-                
-                size_item = QTableWidgetItem(disk['size'])
-                size_item.setFlags(size_item.flags() & ~Qt.ItemIsEditable)
-                self.disk_table.setItem(i, 2, size_item)
-                
-                model_item = QTableWidgetItem(disk['model'])
-                model_item.setFlags(model_item.flags() & ~Qt.ItemIsEditable)
-                self.disk_table.setItem(i, 3, model_item)
-                
-        except subprocess.CalledProcessError as e:
-            QMessageBox.critical(self, "Error", f"Failed to retrieve disk information:\n{e}")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Unexpected error while scanning disks:\n{e}")
+                self.disk_table.setItem(i, 1, _readonly_item(disk['device']))
+                self.disk_table.setItem(i, 2, _readonly_item(disk['size']))
+                self.disk_table.setItem(i, 3, _readonly_item(disk['model']))
+        finally:
+            self.disk_table.blockSignals(False)
+            self.disk_table.setUpdatesEnabled(True)
     
-    def _parse_size(self, size_str):
-        """Parse size string (e.g., '8G', '500M') to bytes"""
-        size_str = size_str.upper().strip()
-        
-        multipliers = {
-            'B': 1,
-            'K': 1024,
-            'M': 1024**2,
-            'G': 1024**3,
-            'T': 1024**4
-        }
-        
-        for suffix, multiplier in multipliers.items():
-            if size_str.endswith(suffix):
-                try:
-                    number = float(size_str[:-1])
-                    return int(number * multiplier)
-                except ValueError:
-                    pass
-        
-        # Try parsing as plain number (bytes)
-        try:
-            return int(float(size_str))
-        except ValueError:
-            raise ValueError(f"Cannot parse size: {size_str}")
+    def _on_scan_error(self, message):
+        """Report a failed disk scan"""
+        QMessageBox.critical(self, "Error", message)
     
     def _on_disk_selected(self, checked, disk):
         """Handle disk selection"""
@@ -764,27 +1130,26 @@ class DiskSelectionWidget(QWidget):
             self._update_selected_info(disk)
     
     def _update_selected_info(self, disk):
-        """Update selected disk information display"""
+        """Record the selected disk and update its information display"""
+        self.selected_disk = disk['device']
         self.selected_info.setText(f"Selected: {disk['device']} ({disk['size']}) - {disk['model']}")
     
     def get_selected_disk(self):
         """Get the currently selected disk device path"""
-        for i in range(self.disk_table.rowCount()):
-            radio_widget = self.disk_table.cellWidget(i, 0)
-            if radio_widget:
-                radio = radio_widget.findChild(QRadioButton)
-                if radio and radio.isChecked():
-                    return self.disk_table.item(i, 1).text()
-        return None
+        return self.selected_disk
     
     def validate_selection(self):
         """Validate that a disk is selected"""
-        selected = self.get_selected_disk()
-        if not selected:
+        if not self.selected_disk:
             QMessageBox.warning(self, "No Disk Selected", 
                               "Please select a disk for installation.")
             return False
         return True
+    
+    def wait_for_scan(self):
+        """Block until a running disk scan has finished"""
+        if self.scan_thread and self.scan_thread.isRunning():
+            self.scan_thread.wait()
 
 class UserConfigWidget(QWidget):
     def __init__(self):
@@ -875,9 +1240,57 @@ class UserConfigWidget(QWidget):
             'keyboard': self.keyboard_combo.currentText()
         }
 
+# Kuns OS base packages
+_BASE_PACKAGES = (
+    "base", "linux", "linux-firmware", "grub", "efibootmgr", "networkmanager",
+    "enlightenment", "lightdm", "lightdm-gtk-greeter",
+    "xorg", "xorg-server", "xorg-xinit",
+    "pulseaudio", "pulseaudio-alsa",
+    "flatpak", "firefox", "noto-fonts", "noto-fonts-cjk", "ttf-dejavu", "ttf-liberation"
+)
+
+# KDE apps (Kuns OS default)
+_KDE_APPS = (
+    "ark", "dolphin", "gwenview", "kate", "konsole", "kwrite", 
+    "okular", "spectacle"
+)
+
+# GNOME apps (Kuns OS default)
+_GNOME_APPS = (
+    "gnome-calculator", "gnome-disk-utility", "gnome-screenshot",
+    "gnome-system-monitor", "gnome-terminal", "gnome-text-editor",
+    "nautilus", "evince", "gedit"
+)
+
+# Basic utilities
+_UTILITIES = (
+    "gparted", "pavucontrol", "network-manager-applet",
+    "sudo", "nano", "wget", "curl", "zip", "unzip"
+)
+
+# Additional software groups: (group key, title)
+_SOFTWARE_GROUPS = (
+    ("dev", "Development Tools"),
+    ("media", "Multimedia"),
+    ("office", "Office & Documents"),
+)
+
+# Additional software: (key, label, checked by default, packages, group key)
+_SOFTWARE_SPEC = (
+    ("vscode", "Visual Studio Code", True, ("code",), "dev"),
+    ("vim_neovim", "Vim & Neovim", False, ("vim", "neovim"), "dev"),
+    ("git", "Git & Development Tools", True, ("git", "base-devel"), "dev"),
+    ("gimp", "GIMP (Image Editor)", False, ("gimp",), "media"),
+    ("vlc", "VLC (Media Player)", True, ("vlc",), "media"),
+    ("audacity", "Audacity (Audio Editor)", False, ("audacity",), "media"),
+    ("libreoffice", "LibreOffice (Office Suite)", True, ("libreoffice-fresh",), "office"),
+    ("thunderbird", "Thunderbird (Email Client)", False, ("thunderbird",), "office"),
+)
+
 class PackageSelectionWidget(QWidget):
     def __init__(self):
         super().__init__()
+        self._packages_cache = None
         self.setup_ui()
         
     def setup_ui(self):
@@ -927,49 +1340,20 @@ class PackageSelectionWidget(QWidget):
         self.software_group = QGroupBox("Additional Software")
         software_layout = QVBoxLayout(self.software_group)
         
-        # Development tools
-        dev_group = QGroupBox("Development Tools")
-        dev_layout = QVBoxLayout(dev_group)
-        
-        self.vscode_check = QCheckBox("Visual Studio Code")
-        self.vscode_check.setChecked(True)
-        self.vim_neovim_check = QCheckBox("Vim & Neovim")
-        self.git_check = QCheckBox("Git & Development Tools")
-        self.git_check.setChecked(True)
-        
-        dev_layout.addWidget(self.vscode_check)
-        dev_layout.addWidget(self.vim_neovim_check)
-        dev_layout.addWidget(self.git_check)
-        
-        software_layout.addWidget(dev_group)
-        
-        # Multimedia
-        media_group = QGroupBox("Multimedia")
-        media_layout = QVBoxLayout(media_group)
-        
-        self.gimp_check = QCheckBox("GIMP (Image Editor)")
-        self.vlc_check = QCheckBox("VLC (Media Player)")
-        self.vlc_check.setChecked(True)
-        self.audacity_check = QCheckBox("Audacity (Audio Editor)")
-        
-        media_layout.addWidget(self.gimp_check)
-        media_layout.addWidget(self.vlc_check)
-        media_layout.addWidget(self.audacity_check)
-        
-        software_layout.addWidget(media_group)
-        
-        # Office & Documents
-        office_group = QGroupBox("Office & Documents")
-        office_layout = QVBoxLayout(office_group)
-        
-        self.libreoffice_check = QCheckBox("LibreOffice (Office Suite)")
-        self.libreoffice_check.setChecked(True)
-        self.thunderbird_check = QCheckBox("Thunderbird (Email Client)")
-        
-        office_layout.addWidget(self.libreoffice_check)
-        office_layout.addWidget(self.thunderbird_check)
-        
-        software_layout.addWidget(office_group)
+        # One group box per category, filled from the software table
+        self.checks = {}
+        for group_key, group_title in _SOFTWARE_GROUPS:
+            group = QGroupBox(group_title)
+            group_layout = QVBoxLayout(group)
+            
+            for key, label, checked, _, spec_group in _SOFTWARE_SPEC:
+                if spec_group == group_key:
+                    check = QCheckBox(label)
+                    check.setChecked(checked)
+                    group_layout.addWidget(check)
+                    self.checks[key] = check
+            
+            software_layout.addWidget(group)
         
         layout.addWidget(self.software_group)
         
@@ -983,62 +1367,46 @@ class PackageSelectionWidget(QWidget):
         self.software_group.setEnabled(self.install_radio_full.isChecked())
         
     def get_packages(self):
-        # Kuns OS base packages
-        base_packages = [
-            "base", "linux", "linux-firmware", "grub", "efibootmgr", "networkmanager",
-            "enlightenment", "lightdm", "lightdm-gtk-greeter",
-            "xorg", "xorg-server", "xorg-xinit",
-            "pulseaudio", "pulseaudio-alsa",
-            "flatpak", "firefox", "noto-fonts", "noto-fonts-cjk", "ttf-dejavu", "ttf-liberation"
-        ]
-        
-        # KDE apps (Kuns OS default)
-        kde_apps = [
-            "ark", "dolphin", "gwenview", "kate", "konsole", "kwrite", 
-            "okular", "spectacle"
-        ]
-        
-        # GNOME apps (Kuns OS default)
-        gnome_apps = [
-            "gnome-calculator", "gnome-disk-utility", "gnome-screenshot",
-            "gnome-system-monitor", "gnome-terminal", "gnome-text-editor",
-            "nautilus", "evince", "gedit"
-        ]
-        
-        # Basic utilities
-        utilities = [
-            "gparted", "pavucontrol", "network-manager-applet",
-            "sudo", "nano", "vim", "wget", "curl", "zip", "unzip"
-        ]
-        
-        packages = base_packages + kde_apps + gnome_apps + utilities
-        
+        # Additional software is only installed with the full installation
+        mask = 0
         if self.install_radio_full.isChecked():
-            # 추가 소프트웨어
-            if self.vscode_check.isChecked():
-                packages.append("code")
-            if self.vim_neovim_check.isChecked():
-                packages.extend(["vim", "neovim"])
-            if self.git_check.isChecked():
-                packages.extend(["git", "base-devel"])
-            if self.gimp_check.isChecked():
-                packages.append("gimp")
-            if self.vlc_check.isChecked():
-                packages.append("vlc")
-            if self.audacity_check.isChecked():
-                packages.append("audacity")
-            if self.libreoffice_check.isChecked():
-                packages.append("libreoffice-fresh")
-            if self.thunderbird_check.isChecked():
-                packages.append("thunderbird")
-        
-        return packages
+            for bit, (key, *_) in enumerate(_SOFTWARE_SPEC):
+                if self.checks[key].isChecked():
+                    mask |= 1 << bit
+        
+        # Reuse the last list while the selection hasn't changed
+        if self._packages_cache is None or self._packages_cache[0] != mask:
+            packages = list(_BASE_PACKAGES + _KDE_APPS + _GNOME_APPS + _UTILITIES)
+            packages.extend(p for bit, (_, _, _, pkgs, _) in enumerate(_SOFTWARE_SPEC)
+                            if mask & (1 << bit) for p in pkgs)
+            # Remove duplicates so the package count shown to the user is accurate
+            self._packages_cache = (mask, list(dict.fromkeys(packages)))
+        
+        return self._packages_cache[1]
+
+_MONO_FONT = None
+
+def _mono_font():
+    """Return the shared log font, building it on first use"""
+    global _MONO_FONT
+    if _MONO_FONT is None:
+        _MONO_FONT = QFont("Consolas", 9)
+        # Consolas is rarely installed; let Qt fall back to any monospace font
+        _MONO_FONT.setStyleHint(QFont.Monospace)
+    return _MONO_FONT
 
 class InstallProgressWidget(QWidget):
     def __init__(self):
         super().__init__()
         self.setup_ui()
         
+        # Log lines are buffered and written to the log view in batches
+        self._log_buffer = collections.deque()
+        self._log_timer = QTimer(self)
+        self._log_timer.setInterval(80)
+        self._log_timer.timeout.connect(self._flush_log)
+        self._log_timer.start()
+        
     def setup_ui(self):
         layout = QVBoxLayout(self)
         
@@ -1063,10 +1431,11 @@ class InstallProgressWidget(QWidget):
         log_group = QGroupBox("Installation Log")
         log_layout = QVBoxLayout(log_group)
         
-        self.log_text = QTextEdit()
+        self.log_text = QPlainTextEdit()
         self.log_text.setMaximumHeight(200)
         self.log_text.setReadOnly(True)
-        self.log_text.setFont(QFont("Consolas", 9))
+        self.log_text.setFont(_mono_font())
+        self.log_text.setMaximumBlockCount(5000)
         log_layout.addWidget(self.log_text)
         
         layout.addWidget(log_group)
@@ -1080,8 +1449,21 @@ class InstallProgressWidget(QWidget):
         self.status_label.setText(text)
     
     def add_log(self, text):
-        self.log_text.append(text)
-        self.log_text.ensureCursorVisible()
+        self._log_buffer.append(text)
+    
+    def _flush_log(self):
+        """Write buffered log lines to the log view in one edit"""
+        if not self._log_buffer:
+            return
+        chunk = "\n".join(self._log_buffer)
+        self._log_buffer.clear()
+        
+        # Only follow new output if the user has not scrolled up to read
+        scrollbar = self.log_text.verticalScrollBar()
+        at_bottom = scrollbar.value() >= scrollbar.maximum() - 4
+        self.log_text.appendPlainText(chunk)
+        if at_bottom:
+            scrollbar.setValue(scrollbar.maximum())
 
 
 
@@ -1096,7 +1478,6 @@ class KunsInstaller(QMainWindow):
         self.install_thread = None
         
         self.setup_ui()
-        self.apply_styles()
         
     def setup_ui(self):
         central = QWidget()
@@ -1122,63 +1503,51 @@ class KunsInstaller(QMainWindow):
         # Page stack
         self.stack = QStackedWidget()
         
-        # Pages
-        self.welcome_page = self.create_welcome_page()
-        self.disk_page = DiskSelectionWidget()
-        self.user_page = UserConfigWidget()
-        self.package_page = PackageSelectionWidget()
-        self.progress_page = InstallProgressWidget()
-        self.finish_page = self.create_finish_page()
-        
-        self.stack.addWidget(self.welcome_page)
-        self.stack.addWidget(self.disk_page)
-        self.stack.addWidget(self.user_page)
-        self.stack.addWidget(self.package_page)
-        self.stack.addWidget(self.progress_page)
-        self.stack.addWidget(self.finish_page)
+        # Pages are built the first time they are shown; until then the
+        # stack holds an empty placeholder at each index
+        self._page_factories = [
+            ("welcome_page", self.create_welcome_page),
+            ("disk_page", DiskSelectionWidget),
+            ("user_page", UserConfigWidget),
+            ("package_page", PackageSelectionWidget),
+            ("progress_page", InstallProgressWidget),
+            ("finish_page", self.create_finish_page),
+        ]
+        for attr, _ in self._page_factories:
+            setattr(self, attr, None)
+            self.stack.addWidget(QWidget())
+        
+        # Swapping out the current placeholder moves the stack off page 0
+        self._ensure_page(0)
+        self.stack.setCurrentIndex(0)
         
         layout.addWidget(self.stack)
         
         # Buttons
         self.create_buttons(layout)
         
+    def _ensure_page(self, index):
+        """Build the page at index if it hasn't been built yet"""
+        attr, factory = self._page_factories[index]
+        page = getattr(self, attr)
+        if page is None:
+            page = factory()
+            placeholder = self.stack.widget(index)
+            self.stack.removeWidget(placeholder)
+            placeholder.deleteLater()
+            self.stack.insertWidget(index, page)
+            setattr(self, attr, page)
+        return page
+    
     def create_welcome_page(self):
         page = QWidget()
         layout = QVBoxLayout(page)
         
         layout.addStretch()
         
-        welcome_text = QLabel("""
-        <div style="text-align: center;">
-        <h1 style="color: #2980b9; margin-bottom: 20px;">Welcome to Kuns OS!</h1>
-        
-        <div style="background: rgba(52, 152, 219, 0.1); padding: 20px; border-radius: 10px; margin: 20px 0;">
-        <h2 style="color: #3498db; margin-top: 0;">Kuns OS Special Features</h2>
-        
-        <div style="text-align: left; margin: 15px 0;">
-        <p style="margin: 8px 0;"><b>Enlightenment Desktop</b><br>
-        &nbsp;&nbsp;&nbsp;&nbsp;Beautiful and lightweight desktop environment</p>
-        
-        <p style="margin: 8px 0;"><b>Best KDE + GNOME Apps</b><br>
-        &nbsp;&nbsp;&nbsp;&nbsp;Dolphin, Kate, Nautilus, GIMP and more useful tools</p>
-        
-        <p style="margin: 8px 0;"><b>Flatpak Support</b><br>
-        &nbsp;&nbsp;&nbsp;&nbsp;Easy app installation and management</p>
-        
-        <p style="margin: 8px 0;"><b>Multi-language Support</b><br>
-        &nbsp;&nbsp;&nbsp;&nbsp;Optimized environment for global users</p>
-        </div>
-        </div>
-        
-        <div style="background: rgba(231, 76, 60, 0.1); padding: 15px; border-radius: 8px; margin: 20px 0;">
-        <p style="color: #e74c3c; font-weight: bold; margin: 0;">
-        Important Notice<br>
-        All data on the selected disk will be deleted during installation.<br>
-        Please backup important data beforehand.
-        </p>
-        </div>
-        </div>
-        """)
+        welcome_text = QLabel()
+        welcome_text.setTextFormat(Qt.RichText)
+        welcome_text.setText(_WELCOME_HTML)
         welcome_text.setWordWrap(True)
         welcome_text.setAlignment(Qt.AlignCenter)
         layout.addWidget(welcome_text)
@@ -1193,29 +1562,9 @@ class KunsInstaller(QMainWindow):
         
         layout.addStretch()
         
-        finish_text = QLabel("""
-        <div style="text-align: center;">
-        <h1 style="color: #27ae60; margin-bottom: 20px;">Kuns OS Installation Complete!</h1>
-        
-        <p style="font-size: 16px; margin: 15px 0;">
-        Congratulations! Kuns OS has been installed successfully.
-        </p>
-        
-        <div style="background: rgba(52, 152, 219, 0.1); padding: 20px; border-radius: 10px; margin: 20px;">
-        <h3 style="color: #3498db; margin-top: 0;">Next Steps</h3>
-        <div style="text-align: left;">
-        <p><b>1.</b> Remove installation media (USB/DVD)</p>
-        <p><b>2.</b> Restart your computer</p>
-        <p><b>3.</b> Enjoy Enlightenment desktop!</p>
-        <p><b>4.</b> Install additional apps with Flatpak</p>
-        </div>
-        </div>
-        
-        <p style="color: #7f8c8d; font-size: 14px;">
-        If you have issues, contact the Kuns OS community.
-        </p>
-        </div>
-        """)
+        finish_text = QLabel()
+        finish_text.setTextFormat(Qt.RichText)
+        finish_text.setText(_FINISH_HTML)
         finish_text.setWordWrap(True)
         finish_text.setAlignment(Qt.AlignCenter)
         layout.addWidget(finish_text)
@@ -1254,135 +1603,6 @@ class KunsInstaller(QMainWindow):
         
         layout.addLayout(btn_layout)
     
-    def apply_styles(self):
-        self.setStyleSheet("""
-            QMainWindow {
-                background-color: #ecf0f1;
-            }
-            
-            QWidget {
-                background-color: #ecf0f1;
-                color: #2c3e50;
-            }
-            
-            QPushButton {
-                background-color: #3498db;
-                color: white;
-                border: none;
-                padding: 10px 20px;
-                font-size: 14px;
-                border-radius: 5px;
-                font-weight: bold;
-            }
-            
-            QPushButton:hover {
-                background-color: #2980b9;
-            }
-            
-            QPushButton:pressed {
-                background-color: #21618c;
-            }
-            
-            QPushButton:disabled {
-                background-color: #bdc3c7;
-                color: #7f8c8d;
-            }
-            
-            QLineEdit, QComboBox {
-                background-color: white;
-                border: 2px solid #bdc3c7;
-                padding: 8px;
-                border-radius: 4px;
-                font-size: 14px;
-            }
-            
-            QLineEdit:focus, QComboBox:focus {
-                border-color: #3498db;
-            }
-            
-            QGroupBox {
-                font-weight: bold;
-                border: 2px solid #bdc3c7;
-                border-radius: 5px;
-                margin-top: 10px;
-                padding-top: 10px;
-            }
-            
-            QGroupBox::title {
-                subcontrol-origin: margin;
-                left: 10px;
-                padding: 0 5px 0 5px;
-            }
-            
-            QProgressBar {
-                border: 2px solid #bdc3c7;
-                border-radius: 5px;
-                text-align: center;
-                font-weight: bold;
-            }
-            
-            QProgressBar::chunk {
-                background-color: #27ae60;
-                border-radius: 3px;
-            }
-            
-            QTableWidget {
-                background-color: white;
-                alternate-background-color: #f8f9fa;
-                border: 1px solid #bdc3c7;
-                border-radius: 4px;
-            }
-            
-            QTableWidget::item {
-                padding: 8px;
-            }
-            
-            QTextEdit {
-                background-color: #2c3e50;
-                color: #ecf0f1;
-                border: 1px solid #34495e;
-                border-radius: 4px;
-                font-family: 'Consolas', 'Monaco', monospace;
-            }
-            
-            QCheckBox {
-                spacing: 10px;
-            }
-            
-            QCheckBox::indicator {
-                width: 18px;
-                height: 18px;
-            }
-            
-            QCheckBox::indicator:unchecked {
-                border: 2px solid #bdc3c7;
-                background-color: white;
-                border-radius: 3px;
-            }
-            
-            QCheckBox::indicator:checked {
-                border: 2px solid #27ae60;
-                background-color: #27ae60;
-                border-radius: 3px;
-            }
-            
-            QRadioButton::indicator {
-                width: 18px;
-                height: 18px;
-                border-radius: 9px;
-            }
-            
-            QRadioButton::indicator:unchecked {
-                border: 2px solid #bdc3c7;
-                background-color: white;
-            }
-            
-            QRadioButton::indicator:checked {
-                border: 2px solid #3498db;
-                background-color: #3498db;
-            }
-        """)
-    
     def next_page(self):
         if self.current_page == 1:  # Disk selection page
             if not self.disk_page.validate_selection():
@@ -1401,23 +1621,22 @@ class KunsInstaller(QMainWindow):
             self.update_page()
     
     def update_page(self):
+        self._ensure_page(self.current_page)
         self.stack.setCurrentIndex(self.current_page)
         
-        self.prev_btn.setEnabled(self.current_page > 0)
-        self.next_btn.setVisible(self.current_page < 3)
-        self.install_btn.setVisible(self.current_page == 3)
-        
-        if self.current_page == 4:  # Installation page
-            self.prev_btn.setEnabled(False)
-            self.cancel_btn.setText("Cancel Installation")
-        elif self.current_page == 5:  # Completion page
-            self.prev_btn.setVisible(False)
-            self.next_btn.setVisible(False)
-            self.install_btn.setVisible(False)
-            self.cancel_btn.setText("Close")
+        prev_visible, prev_enabled, next_visible, install_visible, cancel_text = _PAGE_STATE[self.current_page]
+        self.prev_btn.setVisible(prev_visible)
+        self.prev_btn.setEnabled(prev_enabled)
+        self.next_btn.setVisible(next_visible)
+        self.install_btn.setVisible(install_visible)
+        self.cancel_btn.setText(cancel_text)
     
     def start_install(self):
-        # Check settings
+        # The settings pages only exist once the user has navigated through them
+        if self.package_page is None:
+            return
+        
+        # A late rescan can still change the selection, so check it again
         if not self.disk_page.validate_selection():
             return
         
@@ -1431,13 +1650,9 @@ class KunsInstaller(QMainWindow):
         # Confirmation dialog
         reply = QMessageBox.question(
             self, "Kuns OS Installation Confirmation",
-            f"Would you like to start Kuns OS installation with the following settings?\n\n"
-            f"Disk: {disk}\n"
-            f"User: {user_config['username']}\n"
-            f"Hostname: {user_config['hostname']}\n"
-            f"Installation Type: {install_type}\n"
-            f"Packages: {len(packages)} packages\n\n"
-            f"WARNING: All data on {disk} will be deleted!",
+            _CONFIRM_TMPL.format(disk=disk, user=user_config['username'],
+                                 host=user_config['hostname'], itype=install_type,
+                                 n=len(packages)),
             QMessageBox.Yes | QMessageBox.No
         )
         
@@ -1464,7 +1679,8 @@ class KunsInstaller(QMainWindow):
         self.install_thread = ArchInstallThread(config)
         self.install_thread.progress.connect(self.progress_page.update_progress)
         self.install_thread.status.connect(self.progress_page.update_status)
-        self.install_thread.log_output.connect(self.progress_page.add_log)
+        # Log chunks arrive from the worker thread; queue them explicitly
+        self.install_thread.log_output.connect(self.progress_page.add_log, Qt.QueuedConnection)
         self.install_thread.finished.connect(self.install_finished)
         
         self.install_thread.start()
@@ -1504,37 +1720,34 @@ class KunsInstaller(QMainWindow):
                 event.ignore()
         else:
             event.accept()
+        
+        # A running QThread must not be destroyed with the window
+        if event.isAccepted() and self.disk_page is not None:
+            self.disk_page.wait_for_scan()
 
 def main():
-    app = QApplication(sys.argv)
-    app.setApplicationName("Kuns OS Installer")
-    app.setOrganizationName("Kuns OS")
-    
-    # Check root privileges
+    # Check root privileges before paying for Qt initialisation
     if os.geteuid() != 0:
-        QMessageBox.critical(None, "Permission Error", 
-                           "Kuns OS installer requires administrator privileges.\n\n"
-                           "Please run with 'sudo kuns-installer' from terminal\n"
-                           "or login as administrator.")
+        print("Kuns OS installer requires administrator privileges.\n"
+              "Please run with 'sudo kuns-installer' from terminal\n"
+              "or login as administrator.", file=sys.stderr)
         sys.exit(1)
     
     # Check required tools availability
-    required_tools = ['parted', 'mkfs.fat', 'mkfs.ext4', 'mount', 'pacstrap', 'genfstab', 'arch-chroot']
-    missing_tools = []
-    
-    for tool in required_tools:
-        try:
-            subprocess.run(['which', tool], capture_output=True, check=True)
-        except subprocess.CalledProcessError:
-            missing_tools.append(tool)
+    required_tools = ['parted', 'mkfs.fat', 'mkfs.ext4', 'mount', 'blkid', 'pacstrap', 'arch-chroot']
+    missing_tools = [tool for tool in required_tools if shutil.which(tool) is None]
     
     if missing_tools:
-        QMessageBox.critical(None, "Dependency Error",
-                           f"Required tools are missing: {', '.join(missing_tools)}\n\n"
-                           "Please make sure you're running on Arch Linux installation media\n"
-                           "with arch-install-scripts package installed.")
+        print(f"Required tools are missing: {', '.join(missing_tools)}\n"
+              "Please make sure you're running on Arch Linux installation media\n"
+              "with arch-install-scripts package installed.", file=sys.stderr)
         sys.exit(1)
     
+    app = QApplication(sys.argv)
+    app.setApplicationName("Kuns OS Installer")
+    app.setOrganizationName("Kuns OS")
+    app.setStyleSheet(_STYLESHEET)
+    
     installer = KunsInstaller()
     installer.show()
     